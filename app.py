@@ -3,16 +3,19 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import gdown
-import os
-import zipfile
 from typing import Optional, Dict, Tuple, List
 import warnings
-import urllib.request
+
+from utils.data_loader import load_data_from_drive, get_image_path, get_article_thumbnail, top_k_positions, performance_tiers
+from utils.kernels import NUMBA_AVAILABLE
+
+if NUMBA_AVAILABLE:
+    from utils.kernels import match_score_kernel, group_threshold_counts
 
 warnings.filterwarnings('ignore')
 
-IMAGE_FILE_ID = "1z27fEDUpgXfiFzb1eUv5i5pbIA_cI7UA"
+# Candidate count above which the fused Numba scoring kernel beats the NumPy expression
+NUMBA_SCORE_THRESHOLD = 20000
 
 # ============================================================================
 # PAGE CONFIGURATION
@@ -63,118 +66,40 @@ if 'detail_product_id' not in st.session_state:
     st.session_state.detail_product_id = None
 
 # ============================================================================
-# DATA LOADING FUNCTIONS
+# DATA HELPERS
 # ============================================================================
 
-def ensure_data_dir():
-    os.makedirs('data', exist_ok=True)
+def category_code_matches(column: pd.Series, value: str) -> np.ndarray:
+    """Boolean mask for column == value, compared on the small integer category codes"""
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column.to_numpy() == value
+    categories = column.cat.categories
+    if value not in categories:
+        return np.zeros(len(column), dtype=bool)
+    return column.cat.codes.to_numpy() == categories.get_loc(value)
 
-def download_from_drive(file_id: str, file_path: str) -> bool:
-    """Download file from Google Drive with multiple fallback methods"""
-    try:
-        if os.path.exists(file_path):
-            return True
-        
-        url = f"https://drive.google.com/uc?id={file_id}"
-        
-        try:
-            gdown.download(url, file_path, quiet=False)
-        except:
-            try:
-                urllib.request.urlretrieve(url, file_path)
-            except:
-                import requests
-                response = requests.get(url, timeout=30)
-                if response.status_code == 200:
-                    with open(file_path, 'wb') as f:
-                        f.write(response.content)
-        
-        return os.path.exists(file_path)
-    except:
-        return False
-
-def load_csv_safe(file_path: str) -> Optional[pd.DataFrame]:
-    try:
-        return pd.read_csv(file_path)
-    except:
-        return None
-
-@st.cache_resource
-def load_data_from_drive() -> Dict:
-    data = {}
-    ensure_data_dir()
-    
-    DRIVE_FILES = {
-        'article_master_web': '1rLdTRGW2iu50edIDWnGSBkZqWznnNXLK',
-        'customer_dna_master': '182gmD8nYPAuy8JO_vIqzVJy8eMKqrGvH',
-        'customer_test_validation': '1mAufyQbOrpXdjkYXE4nhYyleGBoB6nXB',
-        'visual_dna_embeddings': '1VLNeGstZhn0_TdMiV-6nosxvxyFO5a54',
-        'hm_web_images': '1z27fEDUpgXfiFzb1eUv5i5pbIA_cI7UA'
-    }
-    
-    csv_files = {
-        'article_master_web': 'article_master_web.csv',
-        'customer_dna_master': 'customer_dna_master.csv',
-        'customer_test_validation': 'customer_test_validation.csv',
-        'visual_dna_embeddings': 'visual_dna_embeddings.csv'
-    }
-    
-    st.info("🔄 Loading data from Google Drive...")
-    progress_bar = st.progress(0)
-    
-    for idx, (key, filename) in enumerate(csv_files.items()):
-        file_path = f'data/{filename}'
-        if download_from_drive(DRIVE_FILES[key], file_path):
-            df = load_csv_safe(file_path)
-            if df is not None:
-                data[key] = df
-        progress_bar.progress((idx + 1) / (len(csv_files) + 1))
-    
-    # Load images
-    images_zip_path = 'data/hm_web_images.zip'
-    images_dir = 'data/hm_web_images'
-    
-    if not os.path.exists(images_dir):
-        if not os.path.exists(images_zip_path):
-            st.info("📥 Downloading images (this may take a few minutes)...")
-            download_from_drive(DRIVE_FILES['hm_web_images'], images_zip_path)
-        
-        if os.path.exists(images_zip_path):
-            try:
-                st.info("📦 Extracting images...")
-                os.makedirs(images_dir, exist_ok=True)
-                with zipfile.ZipFile(images_zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(images_dir)
-                st.success("✅ Images extracted!")
-            except Exception as e:
-                st.warning(f"⚠️ Image extraction issue: {str(e)}")
-    
-    data['images_dir'] = images_dir if os.path.exists(images_dir) else None
-    st.success("✅ Data loaded successfully!")
-    progress_bar.progress(1.0)
-    
-    return data
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_filtered_positions(_df_articles: pd.DataFrame, frame_id: int, emotion: str, category: str, group: str,
+                           price_range: Optional[Tuple[float, float]]) -> np.ndarray:
+    """Row positions matching the page filters"""
+    mask = np.ones(len(_df_articles), dtype=bool)
+    for col, value in (('mood', emotion), ('section_name', category), ('product_group_name', group)):
+        if value != "All":
+            mask &= category_code_matches(_df_articles[col], value)
+    if price_range is not None:
+        # Both bounds folded into the mask in place through one scratch buffer
+        prices = _df_articles['price'].to_numpy()
+        in_range = np.empty_like(mask)
+        np.greater_equal(prices, price_range[0], out=in_range)
+        mask &= in_range
+        np.less_equal(prices, price_range[1], out=in_range)
+        mask &= in_range
+    return np.flatnonzero(mask)
 
-def get_image_path(article_id: str, images_dir: Optional[str]) -> Optional[str]:
-    """Get image path - images stored directly in folder as 10-digit ID + .jpg"""
-    if images_dir is None:
-        return None
-    try:
-        article_id_str = str(article_id).zfill(10)
-        image_path = os.path.join(images_dir, f"{article_id_str}.jpg")
-        
-        if os.path.exists(image_path):
-            return image_path
-        
-        # Fallback: try other extensions
-        for ext in ['.JPG', '.jpeg', '.JPEG', '.png', '.PNG']:
-            alt_path = os.path.join(images_dir, f"{article_id_str}{ext}")
-            if os.path.exists(alt_path):
-                return alt_path
-        
-        return None
-    except:
-        return None
+def filter_articles(df_articles: pd.DataFrame, emotion: str = "All", category: str = "All",
+                    group: str = "All", price_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+    """Apply page filters"""
+    return df_articles.iloc[get_filtered_positions(df_articles, id(df_articles), emotion, category, group, price_range)]
 
 def get_tier_info(hotness: float) -> Tuple[str, str, str]:
     """Return (tier_name, color_class, strategy)"""
@@ -190,39 +115,224 @@ def get_tier_info(hotness: float) -> Tuple[str, str, str]:
 def get_smart_recommendations(selected_product: pd.Series, df_articles: pd.DataFrame, 
                              n_recommendations: int = 10) -> pd.DataFrame:
     """Hybrid recommendation engine"""
-    candidates = df_articles[
-        (df_articles['article_id'] != selected_product['article_id']) &
-        (df_articles['mood'] == selected_product['mood'])
-    ].copy()
+    # Mood matched on the category codes, the ID on the Arrow array
+    mask = category_code_matches(df_articles['mood'], selected_product['mood'])
+    mask &= (df_articles['article_id'].array != selected_product['article_id']).to_numpy(dtype=bool, na_value=True)
+    candidates = df_articles.iloc[np.flatnonzero(mask)]
     
     if len(candidates) == 0:
         return pd.DataFrame()
     
-    candidates['match_score'] = 0.0
-    candidates['match_score'] += 0.4
-    candidates['match_score'] += (candidates['section_name'] == selected_product['section_name']) * 0.2
+    # Score on raw arrays: mood match (0.4) + section (0.2) + price (0.2) + hotness (0.2)
+    prices = candidates['price'].to_numpy()
+    hotness = candidates['hotness_score'].to_numpy()
+    same_section = category_code_matches(candidates['section_name'], selected_product['section_name'])
     
-    price_diff = abs(candidates['price'] - selected_product['price'])
-    max_price = max(candidates['price'].max(), selected_product['price'])
-    if max_price > 0:
-        price_sim = 1 - (price_diff / (max_price * 0.5)).clip(0, 1)
-        candidates['match_score'] += price_sim * 0.2
+    max_price = max(prices.max(), selected_product['price'])
     
-    hotness_diff = abs(candidates['hotness_score'] - selected_product['hotness_score'])
-    hotness_sim = 1 - hotness_diff.clip(0, 1)
-    candidates['match_score'] += hotness_sim * 0.2
+    if NUMBA_AVAILABLE and len(candidates) >= NUMBA_SCORE_THRESHOLD:
+        match_score = match_score_kernel(
+            prices,
+            hotness,
+            same_section,
+            float(selected_product['price']),
+            float(selected_product['hotness_score']),
+            float(max_price * 0.5)
+        )
+    else:
+        match_score = 0.4 + same_section * 0.2
+        
+        if max_price > 0:
+            price_sim = 1 - np.clip(np.abs(prices - selected_product['price']) / (max_price * 0.5), 0, 1)
+            match_score += price_sim * 0.2
+        
+        hotness_sim = 1 - np.clip(np.abs(hotness - selected_product['hotness_score']), 0, 1)
+        match_score += hotness_sim * 0.2
     
-    candidates = candidates[candidates['match_score'] >= 0.60]
-    return candidates.nlargest(n_recommendations, 'match_score')
+    keep = np.flatnonzero(match_score >= 0.60)
+    keep = keep[top_k_positions(match_score[keep], n_recommendations)]
+    
+    recommendations = candidates.iloc[keep].copy()
+    recommendations['match_score'] = match_score[keep]
+    return recommendations
+
+@st.cache_data(show_spinner=False)
+def get_filter_options(_df_articles: pd.DataFrame, _df_customers: Optional[pd.DataFrame]) -> Dict[str, List[str]]:
+    """Selectbox option lists"""
+    return {
+        'mood': _df_articles['mood'].cat.categories.tolist(),
+        'section': _df_articles['section_name'].cat.categories.tolist(),
+        'group': _df_articles['product_group_name'].cat.categories.tolist(),
+        'segment': _df_customers['segment'].cat.categories.tolist()
+                   if _df_customers is not None and 'segment' in _df_customers.columns else []
+    }
+
+# Page aggregates, persisted to disk and keyed on data_version (the frames aren't hashed)
+@st.cache_data(show_spinner=False, persist="disk")
+def get_executive_summary(_df_articles: pd.DataFrame, data_version: tuple) -> Dict:
+    """Catalogue-wide KPIs and per-emotion aggregates"""
+    emotion_stats = _df_articles.astype({
+        'price': 'float64', 'hotness_score': 'float64', 'revenue_potential': 'float64'
+    }).groupby('mood', observed=True).agg({
+        'price': 'mean',
+        'hotness_score': 'mean',
+        'revenue_potential': 'sum',
+        'article_id': 'count'
+    }).reset_index()
+    return {
+        'avg_price': float(_df_articles['price'].astype('float64').mean()),
+        'avg_hotness': float(_df_articles['hotness_score'].astype('float64').mean()),
+        'total_revenue': float(_df_articles['revenue_potential'].astype('float64').sum()),
+        'emotion_rows': tuple(emotion_stats.itertuples(index=False, name=None)),
+        'revenue_by_emotion': emotion_stats.set_index('mood')['revenue_potential'].sort_values(ascending=False)
+    }
+
+@st.cache_data(show_spinner=False, persist="disk")
+def get_top_by_mood(_df_articles: pd.DataFrame, data_version: tuple, k: int = 10) -> Dict[str, np.ndarray]:
+    """Row positions of each emotion's (and the whole catalogue's) k hottest products"""
+    hotness = _df_articles['hotness_score'].to_numpy()
+    top_by_mood = {"All": top_k_positions(hotness, k)}
+    for mood in _df_articles['mood'].cat.categories:
+        positions = np.flatnonzero(category_code_matches(_df_articles['mood'], mood))
+        top_by_mood[mood] = positions[top_k_positions(hotness[positions], k)]
+    return top_by_mood
+
+@st.cache_data(show_spinner=False, persist="disk")
+def get_performer_counts(_df_articles: pd.DataFrame, data_version: tuple, low: float = 0.3, high: float = 0.7) -> Dict[str, Tuple[int, int]]:
+    """(high, low) performer counts per emotion and for the whole catalogue"""
+    moods = _df_articles['mood'].cat.categories
+    codes = _df_articles['mood'].cat.codes.to_numpy()
+    hotness = _df_articles['hotness_score'].to_numpy()
+    # Thresholds in the column's own precision, so counts match a pandas comparison exactly
+    low, high = hotness.dtype.type(low), hotness.dtype.type(high)
+    
+    if NUMBA_AVAILABLE:
+        above, below = group_threshold_counts(codes, hotness, len(moods), low, high)
+    else:
+        valid = codes >= 0
+        above = np.bincount(codes[valid & (hotness > high)], minlength=len(moods))
+        below = np.bincount(codes[valid & (hotness < low)], minlength=len(moods))
+    
+    counts = {mood: (int(above[i]), int(below[i])) for i, mood in enumerate(moods)}
+    counts["All"] = (int(np.count_nonzero(hotness > high)), int(np.count_nonzero(hotness < low)))
+    return counts
+
+@st.cache_data(show_spinner=False, persist="disk")
+def get_emotion_price_stats(_df_articles: pd.DataFrame, data_version: tuple) -> pd.DataFrame:
+    """Per-emotion price statistics table (Page 3), from one (mood, price) sort"""
+    moods = _df_articles['mood'].cat.categories
+    codes = _df_articles['mood'].cat.codes.to_numpy()
+    prices = _df_articles['price'].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = (codes >= 0) & ~np.isnan(prices)
+    codes, prices = codes[valid], prices[valid]
+    
+    order = np.lexsort((prices, codes))
+    sorted_codes, sorted_prices = codes[order], prices[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    counts = np.diff(np.r_[starts, len(order)])
+    observed = sorted_codes[starts]
+    ends = starts + counts - 1
+    means = np.add.reduceat(sorted_prices, starts) / counts
+    
+    # Two-pass variance (deviations from the group mean) - ddof=1 like pandas, NaN for single items
+    squared_dev = np.add.reduceat((sorted_prices - np.repeat(means, counts)) ** 2, starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stds = np.sqrt(squared_dev / (counts - 1))
+    stds[counts < 2] = np.nan
+    
+    # Min/max at each run's ends, median in the middle
+    medians = (sorted_prices[starts + (counts - 1) // 2] + sorted_prices[starts + counts // 2]) / 2
+    
+    return pd.DataFrame({
+        'Mean': means,
+        'Median': medians,
+        'Std Dev': stds,
+        'Min': sorted_prices[starts],
+        'Max': sorted_prices[ends],
+        'Count': counts
+    }, index=pd.CategoricalIndex(moods[observed], categories=moods, name='mood')).round(2)
+
+# ============================================================================
+# CHART BUILDERS
+# ============================================================================
+
+# Above this many customers the spending chart is drawn as a density grid
+MAX_SCATTER_POINTS = 10000
+DENSITY_BINS = 60
+
+@st.cache_data(show_spinner=False)
+def make_emotion_bubble(stats_rows: Tuple[tuple, ...]) -> go.Figure:
+    """Emotion Performance Matrix"""
+    emotion_stats = pd.DataFrame(
+        list(stats_rows),
+        columns=['Emotion', 'Avg_Price', 'Avg_Hotness', 'Total_Revenue', 'Product_Count']
+    )
+    fig_bubble = px.scatter(
+        emotion_stats,
+        x='Avg_Price',
+        y='Avg_Hotness',
+        size='Total_Revenue',
+        color='Emotion',
+        hover_data=['Product_Count', 'Total_Revenue'],
+        title="Emotion Performance Matrix",
+        labels={'Avg_Price': 'Average Price ($)', 'Avg_Hotness': 'Average Hotness Score'},
+        color_discrete_sequence=px.colors.qualitative.Set2,
+        size_max=60
+    )
+    fig_bubble.update_layout(height=500, showlegend=True)
+    return fig_bubble
+
+@st.cache_data(show_spinner=False)
+def make_price_histogram(_emotion_df: pd.DataFrame, emotion: str) -> go.Figure:
+    """Price distribution for the selected emotion, in 30 bars"""
+    prices = _emotion_df['price'].to_numpy(dtype=np.float64, na_value=np.nan)
+    counts, edges = np.histogram(prices[~np.isnan(prices)], bins=30)
+    fig = go.Figure(go.Bar(
+        x=((edges[:-1] + edges[1:]) / 2).astype(np.float32),
+        y=counts.astype(np.int32),
+        width=np.diff(edges).astype(np.float32),
+        marker_color='#E50019'
+    ))
+    fig.update_layout(xaxis_title='price', yaxis_title='count', bargap=0)
+    return fig
+
+@st.cache_data(show_spinner=False)
+def make_spending_scatter(_customers: pd.DataFrame, emotion: str, segment: str) -> go.Figure:
+    """Spending vs Age - a density grid for large selections"""
+    if len(_customers) > MAX_SCATTER_POINTS:
+        ages = _customers['age'].to_numpy(dtype=np.float64, na_value=np.nan)
+        spending = _customers['avg_spending'].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~(np.isnan(ages) | np.isnan(spending))
+        counts, age_edges, spending_edges = np.histogram2d(ages[valid], spending[valid], bins=DENSITY_BINS)
+        fig = go.Figure(go.Heatmap(
+            x=((age_edges[:-1] + age_edges[1:]) / 2).astype(np.float32),
+            y=((spending_edges[:-1] + spending_edges[1:]) / 2).astype(np.float32),
+            z=np.where(counts > 0, counts, np.nan).T.astype(np.float32),
+            colorscale='Reds',
+            colorbar={'title': 'Customers'}
+        ))
+        fig.update_layout(xaxis_title='age', yaxis_title='avg_spending')
+        return fig
+    return px.scatter(
+        _customers,
+        x='age',
+        y='avg_spending',
+        color='segment' if 'segment' in _customers.columns else None,
+        hover_data=['purchase_count'],
+        color_discrete_map={'Gold': '#FFD700', 'Silver': '#C0C0C0', 'Bronze': '#CD7F32'},
+        render_mode='webgl'
+    )
 
 # ============================================================================
 # LOAD DATA
 # ============================================================================
 try:
     data = load_data_from_drive()
-    if 'article_master_web' not in data or data['article_master_web'] is None:
+    data_version = data['version']
+    if not data['valid']:
         st.error("❌ Could not load product data.")
         st.stop()
+    filter_options = get_filter_options(data['article_master_web'], data.get('customer_dna_master'))
 except Exception as e:
     st.error(f"❌ Error: {str(e)}")
     st.stop()
@@ -245,47 +355,27 @@ if page == "📊 Executive Pulse":
     st.markdown('<div class="subtitle">Executive Pulse - Strategic Overview</div>', unsafe_allow_html=True)
     
     try:
-        df_articles = data['article_master_web'].copy()
+        df_articles = data['article_master_web']
         df_customers = data.get('customer_dna_master')
+        summary = get_executive_summary(df_articles, data_version)
         
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
             st.metric("📦 Total SKUs", f"{len(df_articles):,}", "↑ 2.3%")
         with col2:
-            st.metric("💰 Avg Price", f"${df_articles['price'].mean():.2f}", "↑ 1.2%")
+            st.metric("💰 Avg Price", f"${summary['avg_price']:.2f}", "↑ 1.2%")
         with col3:
-            st.metric("🔥 Avg Hotness", f"{df_articles['hotness_score'].mean():.2f}", "↑ 0.8%")
+            st.metric("🔥 Avg Hotness", f"{summary['avg_hotness']:.2f}", "↑ 0.8%")
         with col4:
             st.metric("👥 Customers", f"{len(df_customers):,}" if df_customers is not None else "N/A", "↑ 5.1%")
         with col5:
-            df_articles['revenue_potential'] = df_articles['price'] * df_articles['hotness_score']
-            st.metric("💵 Revenue Potential", f"${df_articles['revenue_potential'].sum():,.0f}", "↑ 3.4%")
+            st.metric("💵 Revenue Potential", f"${summary['total_revenue']:,.0f}", "↑ 3.4%")
         
         st.divider()
         
         st.subheader("😊 Emotion Matrix (Price vs Hotness vs Revenue)")
         
-        emotion_stats = df_articles.groupby('mood').agg({
-            'price': 'mean',
-            'hotness_score': 'mean',
-            'revenue_potential': 'sum',
-            'article_id': 'count'
-        }).reset_index()
-        emotion_stats.columns = ['Emotion', 'Avg_Price', 'Avg_Hotness', 'Total_Revenue', 'Product_Count']
-        
-        fig_bubble = px.scatter(
-            emotion_stats,
-            x='Avg_Price',
-            y='Avg_Hotness',
-            size='Total_Revenue',
-            color='Emotion',
-            hover_data=['Product_Count', 'Total_Revenue'],
-            title="Emotion Performance Matrix",
-            labels={'Avg_Price': 'Average Price ($)', 'Avg_Hotness': 'Average Hotness Score'},
-            color_discrete_sequence=px.colors.qualitative.Set2,
-            size_max=60
-        )
-        fig_bubble.update_layout(height=500, showlegend=True)
+        fig_bubble = make_emotion_bubble(summary['emotion_rows'])
         st.plotly_chart(fig_bubble, use_container_width=True)
         
         st.divider()
@@ -294,7 +384,7 @@ if page == "📊 Executive Pulse":
         
         with col1:
             st.markdown("**Emotion Distribution**")
-            emotion_counts = df_articles['mood'].value_counts()
+            emotion_counts = data['mood_counts']
             fig_dist = px.pie(
                 values=emotion_counts.values,
                 names=emotion_counts.index,
@@ -304,7 +394,7 @@ if page == "📊 Executive Pulse":
         
         with col2:
             st.markdown("**Revenue by Emotion**")
-            revenue_by_emotion = df_articles.groupby('mood')['revenue_potential'].sum().sort_values(ascending=False)
+            revenue_by_emotion = summary['revenue_by_emotion']
             fig_revenue = px.bar(
                 x=revenue_by_emotion.index,
                 y=revenue_by_emotion.values,
@@ -325,7 +415,7 @@ elif page == "🔍 Inventory & Pricing":
     st.markdown('<div class="subtitle">Inventory & Pricing Intelligence - 4-Tier Strategy</div>', unsafe_allow_html=True)
     
     try:
-        df_articles = data['article_master_web'].copy()
+        df_articles = data['article_master_web']
         images_dir = data.get('images_dir')
         
         col1, col2, col3 = st.columns(3)
@@ -333,33 +423,24 @@ elif page == "🔍 Inventory & Pricing":
         with col1:
             selected_emotion = st.selectbox(
                 "Select Emotion",
-                ["All"] + sorted(df_articles['mood'].unique().tolist()),
+                ["All"] + filter_options['mood'],
                 key="inv_emotion"
             )
         
         with col2:
             selected_category = st.selectbox(
                 "Category",
-                ["All"] + sorted(df_articles['section_name'].unique().tolist())
+                ["All"] + filter_options['section']
             )
         
         with col3:
             selected_group = st.selectbox(
                 "Product Group",
-                ["All"] + sorted(df_articles['product_group_name'].unique().tolist())
+                ["All"] + filter_options['group']
             )
         
         # Filter data
-        filtered_df = df_articles.copy()
-        
-        if selected_emotion != "All":
-            filtered_df = filtered_df[filtered_df['mood'] == selected_emotion]
-        
-        if selected_category != "All":
-            filtered_df = filtered_df[filtered_df['section_name'] == selected_category]
-        
-        if selected_group != "All":
-            filtered_df = filtered_df[filtered_df['product_group_name'] == selected_group]
+        filtered_df = filter_articles(df_articles, selected_emotion, selected_category, selected_group)
         
         st.info(f"📊 Analyzing {len(filtered_df)} products")
         
@@ -375,21 +456,25 @@ elif page == "🔍 Inventory & Pricing":
             'liquidation': (0.0, 0.3, 'tier-liquidation', '📉 Liquidation Tier (<0.3)')
         }
         
+        # Label every product with its tier, then aggregate
+        tier_keys = list(tier_data.keys())[::-1]
+        tier_bins = [-np.inf] + [tier_data[key][1] for key in tier_keys[:-1]] + [np.inf]
+        product_tiers = pd.cut(filtered_df['hotness_score'], bins=tier_bins, labels=tier_keys, right=False)
+        tier_stats = filtered_df.groupby(product_tiers, observed=False).agg(
+            count=('price', 'size'),
+            avg_price=('price', 'mean'),
+            avg_hotness=('hotness_score', 'mean')
+        ).fillna(0)
+        
         cols = st.columns(4)
         
         for idx, (tier_key, (min_h, max_h, color_class, tier_label)) in enumerate(tier_data.items()):
-            tier_products = filtered_df[
-                (filtered_df['hotness_score'] >= min_h) &
-                (filtered_df['hotness_score'] < max_h)
-            ]
-            
-            avg_price = tier_products['price'].mean() if len(tier_products) > 0 else 0
-            avg_hotness = tier_products['hotness_score'].mean() if len(tier_products) > 0 else 0
+            tier_count, avg_price, avg_hotness = tier_stats.loc[tier_key, ['count', 'avg_price', 'avg_hotness']]
             
             with cols[idx]:
                 if st.button(f"""
 {tier_label}
-📦 {len(tier_products)} products
+📦 {int(tier_count)} products
 💰 ${avg_price:.2f} avg
 🔥 {avg_hotness:.2f} hotness
                 """, key=f"tier_{tier_key}", use_container_width=True):
@@ -402,31 +487,28 @@ elif page == "🔍 Inventory & Pricing":
             tier_key = st.session_state.selected_tier
             min_h, max_h, color_class, tier_label = tier_data[tier_key]
             
-            tier_products = filtered_df[
-                (filtered_df['hotness_score'] >= min_h) &
-                (filtered_df['hotness_score'] < max_h)
-            ].sort_values('hotness_score', ascending=False)
+            tier_products = filtered_df[product_tiers == tier_key].sort_values('hotness_score', ascending=False)
             
             st.markdown(f"### {tier_label} - Top Products")
             
             if len(tier_products) > 0:
                 cols = st.columns(5)
                 
-                for idx, (_, product) in enumerate(tier_products.head(20).iterrows()):
+                for idx, product in enumerate(tier_products.head(20).itertuples(index=False)):
                     col_idx = idx % 5
                     
                     with cols[col_idx]:
                         with st.container(border=True):
-                            image_path = get_image_path(product['article_id'], images_dir)
-                            if image_path:
-                                st.image(image_path, use_column_width=True)
+                            thumbnail = get_article_thumbnail(product.article_id, images_dir)
+                            if thumbnail:
+                                st.image(thumbnail, use_column_width=True)
                             else:
                                 st.info("📷 No image")
                             
-                            st.markdown(f"**{product['prod_name'][:25]}...**")
-                            st.write(f"💰 ${product['price']:.2f}")
-                            st.write(f"🔥 {product['hotness_score']:.2f}")
-                            st.write(f"😊 {product['mood']}")
+                            st.markdown(f"**{product.prod_name[:25]}...**")
+                            st.write(f"💰 ${product.price:.2f}")
+                            st.write(f"🔥 {product.hotness_score:.2f}")
+                            st.write(f"😊 {product.mood}")
             else:
                 st.warning("No products in this tier")
     
@@ -441,11 +523,11 @@ elif page == "😊 Emotion Analytics":
     st.markdown('<div class="subtitle">Deep Emotion Analytics</div>', unsafe_allow_html=True)
     
     try:
-        df_articles = data['article_master_web'].copy()
+        df_articles = data['article_master_web']
         
         selected_emotion = st.selectbox(
             "Select Emotion",
-            ["All"] + sorted(df_articles['mood'].unique().tolist()),
+            ["All"] + filter_options['mood'],
             key="emotion_select"
         )
         
@@ -453,7 +535,7 @@ elif page == "😊 Emotion Analytics":
             emotion_df = df_articles
             title_suffix = "All Emotions"
         else:
-            emotion_df = df_articles[df_articles['mood'] == selected_emotion]
+            emotion_df = filter_articles(df_articles, emotion=selected_emotion)
             title_suffix = f"{selected_emotion}"
         
         st.info(f"📊 Analyzing {len(emotion_df)} products - {title_suffix}")
@@ -462,14 +544,7 @@ elif page == "😊 Emotion Analytics":
         
         st.subheader("📊 Emotion Statistics")
         
-        emotion_stats = df_articles.groupby('mood')['price'].agg([
-            ('Mean', 'mean'),
-            ('Median', 'median'),
-            ('Std Dev', 'std'),
-            ('Min', 'min'),
-            ('Max', 'max'),
-            ('Count', 'count')
-        ]).round(2)
+        emotion_stats = get_emotion_price_stats(df_articles, data_version)
         
         st.dataframe(emotion_stats, use_container_width=True)
         
@@ -479,7 +554,8 @@ elif page == "😊 Emotion Analytics":
         
         with col1:
             st.markdown("**Category Affinity by Emotion**")
-            category_affinity = emotion_df['section_name'].value_counts().head(10)
+            category_affinity = emotion_df['section_name'].value_counts()
+            category_affinity = category_affinity[category_affinity > 0].head(10)
             fig_cat = px.bar(
                 x=category_affinity.values,
                 y=category_affinity.index,
@@ -491,19 +567,16 @@ elif page == "😊 Emotion Analytics":
         
         with col2:
             st.markdown("**Price Distribution**")
-            fig_price = px.histogram(
-                emotion_df, x='price', nbins=30,
-                color_discrete_sequence=['#E50019']
-            )
+            fig_price = make_price_histogram(emotion_df, selected_emotion)
             st.plotly_chart(fig_price, use_container_width=True)
         
         st.divider()
         
         st.subheader("⭐ Top 10 Emotion Heroes")
         
-        top_products = emotion_df.nlargest(10, 'hotness_score')[[
+        top_products = df_articles.iloc[get_top_by_mood(df_articles, data_version)[selected_emotion]][[
             'prod_name', 'section_name', 'price', 'hotness_score', 'mood'
-        ]].reset_index(drop=True)
+        ]].astype({'price': 'float64', 'hotness_score': 'float64'}).round({'price': 2, 'hotness_score': 4}).reset_index(drop=True)
         
         top_products.index = top_products.index + 1
         st.dataframe(top_products, use_container_width=True)
@@ -519,9 +592,10 @@ elif page == "👥 Customer DNA":
     st.markdown('<div class="subtitle">Customer DNA & Behavior</div>', unsafe_allow_html=True)
     
     try:
-        df_articles = data['article_master_web'].copy()
+        df_articles = data['article_master_web']
         df_customers = data.get('customer_dna_master')
-        df_transactions = data.get('customer_test_validation')
+        customer_moods = data.get('customer_moods')
+        customer_positions_by_mood = data.get('customer_positions_by_mood')
         
         if df_customers is None:
             st.warning("Customer data not available")
@@ -531,30 +605,29 @@ elif page == "👥 Customer DNA":
             with col1:
                 selected_emotion = st.selectbox(
                     "Select Emotion",
-                    ["All"] + sorted(df_articles['mood'].unique().tolist()),
+                    ["All"] + filter_options['mood'],
                     key="cust_emotion"
                 )
             
             with col2:
                 selected_segment = st.selectbox(
                     "Customer Segment",
-                    ["All"] + sorted(df_customers['segment'].unique().tolist()) if 'segment' in df_customers.columns else ["All"],
+                    ["All"] + filter_options['segment'],
                     key="cust_segment"
                 )
             
-            # Filter customers based on segment
-            filtered_customers = df_customers.copy()
+            # Filter customers by segment and emotion
+            customer_mask = np.ones(len(df_customers), dtype=bool)
             if selected_segment != "All":
-                filtered_customers = filtered_customers[filtered_customers['segment'] == selected_segment]
+                customer_mask &= category_code_matches(df_customers['segment'], selected_segment)
             
-            # Filter transactions by emotion if available
-            filtered_transactions = df_transactions.copy() if df_transactions is not None else None
-            if selected_emotion != "All" and filtered_transactions is not None:
-                # Filter transactions by exact emotion match
-                filtered_trans_by_emotion = filtered_transactions[filtered_transactions['actual_purchased_mood'] == selected_emotion]
-                # Get customers who bought from this emotion
-                emotion_customers = filtered_trans_by_emotion['customer_id'].unique()
-                filtered_customers = filtered_customers[filtered_customers['customer_id'].isin(emotion_customers)]
+            # Customers who bought from this emotion
+            if selected_emotion != "All" and customer_positions_by_mood is not None:
+                emotion_mask = np.zeros(len(df_customers), dtype=bool)
+                emotion_mask[customer_positions_by_mood.get(selected_emotion, np.array([], dtype=np.intp))] = True
+                customer_mask &= emotion_mask
+            
+            filtered_customers = df_customers[customer_mask]
             
             st.divider()
             
@@ -579,14 +652,7 @@ elif page == "👥 Customer DNA":
             with col1:
                 st.markdown("**Spending vs Age**")
                 if len(filtered_customers) > 0:
-                    fig_scatter = px.scatter(
-                        filtered_customers,
-                        x='age',
-                        y='avg_spending',
-                        color='segment' if 'segment' in filtered_customers.columns else None,
-                        hover_data=['purchase_count'],
-                        color_discrete_map={'Gold': '#FFD700', 'Silver': '#C0C0C0', 'Bronze': '#CD7F32'}
-                    )
+                    fig_scatter = make_spending_scatter(filtered_customers, selected_emotion, selected_segment)
                     st.plotly_chart(fig_scatter, use_container_width=True)
                 else:
                     st.info("No data available for selected filters")
@@ -595,6 +661,7 @@ elif page == "👥 Customer DNA":
                 st.markdown("**Segment Distribution**")
                 if 'segment' in filtered_customers.columns and len(filtered_customers) > 0:
                     segment_counts = filtered_customers['segment'].value_counts()
+                    segment_counts = segment_counts[segment_counts > 0]
                     fig_segment = px.pie(
                         values=segment_counts.values,
                         names=segment_counts.index,
@@ -608,43 +675,37 @@ elif page == "👥 Customer DNA":
             
             st.subheader("⭐ Top Loyalists")
             
-            # Build Top Loyalists based on BOTH emotion and segment filters
-            top_loyalists_data = df_customers.copy()
-            
-            # Apply segment filter
-            if selected_segment != "All":
-                top_loyalists_data = top_loyalists_data[top_loyalists_data['segment'] == selected_segment]
-            
-            # Apply emotion filter
-            if selected_emotion != "All" and df_transactions is not None:
-                emotion_customers = df_transactions[df_transactions['actual_purchased_mood'] == selected_emotion]['customer_id'].unique()
-                top_loyalists_data = top_loyalists_data[top_loyalists_data['customer_id'].isin(emotion_customers)]
+            # Top Loyalists follow BOTH emotion and segment filters
+            top_loyalists_data = filtered_customers
             
             if len(top_loyalists_data) > 0:
-                top_customers = top_loyalists_data.nlargest(15, 'purchase_count').copy()
+                top_customers = top_loyalists_data.iloc[top_k_positions(top_loyalists_data['purchase_count'].to_numpy(), 15)]
+                top_customers = top_customers.assign(avg_spending=top_customers['avg_spending'].astype('float64').round(2))
                 
-                # Select columns
                 display_cols = ['customer_id', 'age', 'segment', 'avg_spending', 'purchase_count']
-                top_customers = top_customers[display_cols].reset_index(drop=True)
                 
                 # Add emotion column if transactions available
-                if df_transactions is not None and len(df_transactions) > 0:
-                    emotions = []
-                    for cid in top_customers['customer_id']:
-                        cust_trans = df_transactions[df_transactions['customer_id'] == cid]
-                        if len(cust_trans) > 0:
-                            mode_emotion = cust_trans['actual_purchased_mood'].mode()
-                            emotion = mode_emotion[0] if len(mode_emotion) > 0 else 'N/A'
-                        else:
-                            emotion = 'N/A'
-                        emotions.append(emotion)
-                    top_customers['emotion'] = emotions
-                    top_customers = top_customers[['customer_id', 'age', 'segment', 'emotion', 'avg_spending', 'purchase_count']]
+                if customer_moods:
+                    top_customers = top_customers.assign(
+                        emotion=[customer_moods.get(cid, 'N/A') for cid in top_customers['customer_id']]
+                    )
+                    display_cols.insert(3, 'emotion')
                 
-                # Format display
-                top_customers.index = top_customers.index + 1
-                top_customers.columns = ['Customer ID', 'Age', 'Segment', 'Emotion', 'Avg Spending', 'Purchases']
-                st.dataframe(top_customers, use_container_width=True)
+                # Display labels via column_config
+                st.dataframe(
+                    top_customers,
+                    column_order=display_cols,
+                    column_config={
+                        'customer_id': 'Customer ID',
+                        'age': 'Age',
+                        'segment': 'Segment',
+                        'emotion': 'Emotion',
+                        'avg_spending': 'Avg Spending',
+                        'purchase_count': 'Purchases'
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
             else:
                 st.info("No customers found for selected filters")
     
@@ -659,7 +720,7 @@ elif page == "🤖 AI Recommendation":
     st.markdown('<div class="subtitle">AI Recommendation Engine - Smart Discovery</div>', unsafe_allow_html=True)
     
     try:
-        df_articles = data['article_master_web'].copy()
+        df_articles = data['article_master_web']
         images_dir = data.get('images_dir')
         
         st.subheader("🔍 Product Selection")
@@ -669,46 +730,36 @@ elif page == "🤖 AI Recommendation":
         with col1:
             selected_emotion = st.selectbox(
                 "Emotion",
-                sorted(df_articles['mood'].unique().tolist()),
+                filter_options['mood'],
                 key="rec_emotion"
             )
         
         with col2:
             selected_category = st.selectbox(
                 "Category",
-                ["All"] + sorted(df_articles['section_name'].unique().tolist()),
+                ["All"] + filter_options['section'],
                 key="rec_cat"
             )
         
         with col3:
             selected_group = st.selectbox(
                 "Product Group",
-                ["All"] + sorted(df_articles['product_group_name'].unique().tolist()),
+                ["All"] + filter_options['group'],
                 key="rec_group"
             )
         
         with col4:
+            price_min, price_max = data['price_bounds']
             price_range = st.slider(
                 "Price Range",
-                float(df_articles['price'].min()),
-                float(df_articles['price'].max()),
-                (float(df_articles['price'].min()), float(df_articles['price'].max())),
+                price_min,
+                price_max,
+                (price_min, price_max),
                 key="rec_price"
             )
         
         # Filter products
-        filtered_products = df_articles[df_articles['mood'] == selected_emotion].copy()
-        
-        if selected_category != "All":
-            filtered_products = filtered_products[filtered_products['section_name'] == selected_category]
-        
-        if selected_group != "All":
-            filtered_products = filtered_products[filtered_products['product_group_name'] == selected_group]
-        
-        filtered_products = filtered_products[
-            (filtered_products['price'] >= price_range[0]) &
-            (filtered_products['price'] <= price_range[1])
-        ]
+        filtered_products = filter_articles(df_articles, selected_emotion, selected_category, selected_group, price_range)
         
         # Dynamic KPIs based on filters
         st.divider()
@@ -723,11 +774,10 @@ elif page == "🤖 AI Recommendation":
             avg_hotness = filtered_products['hotness_score'].mean() if len(filtered_products) > 0 else 0
             st.metric("🔥 Avg Hotness", f"{avg_hotness:.2f}")
         with col4:
-            high_perf = len(filtered_products[filtered_products['hotness_score'] > 0.7])
+            high_perf = np.count_nonzero(filtered_products['hotness_score'].to_numpy() > 0.7)
             st.metric("⭐ High Performers", high_perf)
         with col5:
-            filtered_products['revenue'] = filtered_products['price'] * filtered_products['hotness_score']
-            total_revenue = filtered_products['revenue'].sum() if len(filtered_products) > 0 else 0
+            total_revenue = filtered_products['revenue_potential'].sum() if len(filtered_products) > 0 else 0
             st.metric("💵 Revenue Potential", f"${total_revenue:,.0f}")
         
         st.divider()
@@ -741,7 +791,7 @@ elif page == "🤖 AI Recommendation":
                 key="product_select"
             )
             
-            selected_product = df_articles[df_articles['prod_name'] == selected_product_name].iloc[0]
+            selected_product = df_articles.iloc[data['product_positions'][selected_product_name]]
             
             st.divider()
             
@@ -788,38 +838,38 @@ elif page == "🤖 AI Recommendation":
             else:
                 cols = st.columns(5)
                 
-                for idx, (_, product) in enumerate(recommendations.iterrows()):
+                for idx, product in enumerate(recommendations.itertuples(index=False)):
                     col_idx = idx % 5
                     
                     with cols[col_idx]:
                         with st.container(border=True):
-                            image_path = get_image_path(product['article_id'], images_dir)
-                            if image_path:
-                                st.image(image_path, use_column_width=True)
+                            thumbnail = get_article_thumbnail(product.article_id, images_dir)
+                            if thumbnail:
+                                st.image(thumbnail, use_column_width=True)
                             else:
                                 st.info("📷")
                             
-                            st.markdown(f"**{product['prod_name'][:18]}...**")
-                            st.write(f"💰 ${product['price']:.2f}")
-                            st.write(f"🔥 {product['hotness_score']:.2f}")
+                            st.markdown(f"**{product.prod_name[:18]}...**")
+                            st.write(f"💰 ${product.price:.2f}")
+                            st.write(f"🔥 {product.hotness_score:.2f}")
                             
-                            match_pct = product['match_score'] * 100
+                            match_pct = product.match_score * 100
                             st.markdown(
                                 f"<div style='background: linear-gradient(135deg, #E50019 0%, #FF6B6B 100%); color: white; padding: 8px; border-radius: 10px; text-align: center; font-weight: bold; margin-top: 8px;'>✅ {match_pct:.0f}% Match</div>",
                                 unsafe_allow_html=True
                             )
                             
-                            if st.button("View", key=f"view_{product['article_id']}", use_container_width=True):
+                            if st.button("View", key=f"view_{product.article_id}", use_container_width=True):
                                 st.session_state.show_detail_modal = True
-                                st.session_state.detail_product_id = product['article_id']
+                                st.session_state.detail_product_id = product.article_id
                                 st.rerun()
             
             # Detail Modal for Recommended Products
             if st.session_state.show_detail_modal and st.session_state.detail_product_id:
-                detail_product = df_articles[df_articles['article_id'] == st.session_state.detail_product_id]
+                detail_position = data['article_positions'].get(st.session_state.detail_product_id)
                 
-                if len(detail_product) > 0:
-                    detail_product = detail_product.iloc[0]
+                if detail_position is not None:
+                    detail_product = df_articles.iloc[detail_position]
                     
                     st.divider()
                     st.subheader(f"🔍 Detailed View - {detail_product['prod_name']}")
@@ -867,32 +917,30 @@ elif page == "📈 Performance & Financial":
     st.markdown('<div class="subtitle">Performance & Financial Outlook</div>', unsafe_allow_html=True)
     
     try:
-        df_articles = data['article_master_web'].copy()
+        df_articles = data['article_master_web']
         
         selected_emotion = st.selectbox(
             "Select Emotion",
-            ["All"] + sorted(df_articles['mood'].unique().tolist()),
+            ["All"] + filter_options['mood'],
             key="perf_emotion"
         )
         
         if selected_emotion == "All":
             analysis_df = df_articles
         else:
-            analysis_df = df_articles[df_articles['mood'] == selected_emotion]
+            analysis_df = filter_articles(df_articles, emotion=selected_emotion)
         
-        analysis_df['revenue_potential'] = analysis_df['price'] * analysis_df['hotness_score']
-        analysis_df['estimated_margin'] = analysis_df['price'] * 0.4
+        performance_tier = performance_tiers(analysis_df['hotness_score'])
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("💰 Revenue Potential", f"${analysis_df['revenue_potential'].sum():,.0f}")
         with col2:
-            st.metric("📊 Avg Margin", f"${analysis_df['estimated_margin'].mean():.2f}")
+            st.metric("📊 Avg Margin", f"${analysis_df['price'].mean() * 0.4:.2f}")
+        high_performers, low_performers = get_performer_counts(df_articles, data_version)[selected_emotion]
         with col3:
-            high_performers = len(analysis_df[analysis_df['hotness_score'] > 0.7])
             st.metric("⭐ High Performers", high_performers)
         with col4:
-            low_performers = len(analysis_df[analysis_df['hotness_score'] < 0.3])
             st.metric("📉 Low Performers", low_performers)
         
         st.divider()
@@ -901,7 +949,7 @@ elif page == "📈 Performance & Financial":
         
         with col1:
             st.markdown("**Revenue by Category**")
-            revenue_by_cat = analysis_df.groupby('section_name')['revenue_potential'].sum().sort_values(ascending=False).head(15)
+            revenue_by_cat = analysis_df.groupby('section_name', observed=True)['revenue_potential'].sum().sort_values(ascending=False).head(15)
             fig_revenue = px.bar(
                 x=revenue_by_cat.values,
                 y=revenue_by_cat.index,
@@ -913,10 +961,7 @@ elif page == "📈 Performance & Financial":
         
         with col2:
             st.markdown("**Hotness Performance**")
-            hotness_bins = pd.cut(analysis_df['hotness_score'],
-                                 bins=[0, 0.3, 0.5, 0.7, 1.0],
-                                 labels=['Low', 'Medium', 'High', 'Very High'])
-            hotness_dist = hotness_bins.value_counts()
+            hotness_dist = performance_tier.value_counts()
             fig_hotness = px.pie(
                 values=hotness_dist.values,
                 names=hotness_dist.index,
@@ -928,13 +973,9 @@ elif page == "📈 Performance & Financial":
         
         st.subheader("📦 Inventory Health & Optimization")
         
-        analysis_df['performance_tier'] = pd.cut(
-            analysis_df['hotness_score'],
-            bins=[0, 0.3, 0.5, 0.7, 1.0],
-            labels=['Low', 'Medium', 'High', 'Very High']
-        )
-        
-        inventory_rec = analysis_df.groupby('performance_tier').agg({
+        inventory_rec = analysis_df.astype({
+            'price': 'float64', 'hotness_score': 'float64', 'revenue_potential': 'float64'
+        }).groupby(performance_tier, observed=False).agg({
             'article_id': 'count',
             'price': 'mean',
             'hotness_score': 'mean',
@@ -0,0 +1,15 @@
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import performance_tiers
+
+
+def test_edge_hotness_stays_in_lower_tier_after_float32_downcast():
+    hotness = pd.Series([0.3, 0.5, 0.7, 1.0], dtype=np.float32)
+    assert performance_tiers(hotness).tolist() == ['Low', 'Medium', 'High', 'Very High']
+
+
+def test_float32_tiers_match_float64():
+    hotness = pd.Series(np.round(np.linspace(0, 1, 101), 2))
+    expected = performance_tiers(hotness)
+    assert performance_tiers(hotness.astype(np.float32)).tolist() == expected.tolist()
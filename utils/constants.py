@@ -0,0 +1,75 @@
+IMAGES_ZIP_PATH = 'data/hm_web_images.zip'
+IMAGES_DIR = 'data/hm_web_images'
+
+# Preferred image extension first - when an article has several files, the lowest rank wins
+IMAGE_EXTENSION_RANK = {ext: rank for rank, ext in enumerate(['.jpg', '.JPG', '.jpeg', '.JPEG', '.png', '.PNG'])}
+
+# Read/write size when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Streaming download attempts and the first backoff in seconds (doubled after every failure)
+DOWNLOAD_RETRIES = 4
+DOWNLOAD_BACKOFF = 1.0
+
+# Images extracted up front (hottest articles); the rest are extracted on first request
+INITIAL_IMAGE_COUNT = 200
+
+# Grid tile size
+THUMBNAIL_SIZE = (256, 256)
+
+# Lossless sprite sheet of the initially extracted articles' thumbnails, and its tile index
+THUMBNAIL_ATLAS_PATH = 'data/thumbnail_atlas.png'
+THUMBNAIL_ATLAS_INDEX_PATH = 'data/thumbnail_atlas_index.parquet'
+ATLAS_COLUMNS = 16
+
+# Columns the pages read from each dataset
+DATASET_COLUMNS = {
+    'article_master_web': ['article_id', 'prod_name', 'section_name', 'product_group_name',
+                           'mood', 'price', 'hotness_score', 'detail_desc'],
+    'customer_dna_master': ['customer_id', 'age', 'segment', 'avg_spending', 'purchase_count'],
+    'customer_test_validation': ['customer_id', 'actual_purchased_mood']
+}
+
+# Datasets the app can't run without, and the columns each must have populated
+REQUIRED_COLUMNS = {
+    'article_master_web': ['article_id', 'prod_name', 'section_name', 'product_group_name',
+                           'mood', 'price', 'hotness_score']
+}
+
+# Datasets cached as Feather instead of Parquet
+CACHE_FORMATS = {
+    'visual_dna_embeddings': 'feather'
+}
+
+# Low-cardinality text columns stored as Categorical
+CATEGORICAL_COLUMNS = {
+    'article_master_web': ['mood', 'section_name', 'product_group_name'],
+    'customer_dna_master': ['segment'],
+    'customer_test_validation': ['actual_purchased_mood'],
+    'visual_dna_embeddings': ['mood']
+}
+
+# Numeric columns narrowed with pd.to_numeric(downcast=...)
+NUMERIC_DOWNCASTS = {
+    'article_master_web': {'price': 'float', 'hotness_score': 'float'},
+    'customer_dna_master': {'age': 'integer', 'avg_spending': 'float', 'purchase_count': 'integer'},
+    'visual_dna_embeddings': {'x': 'float', 'y': 'float'}
+}
+
+# Signature of the schema tables above, part of the data version
+DATASET_SCHEMA = repr((DATASET_COLUMNS, CACHE_FORMATS, CATEGORICAL_COLUMNS, NUMERIC_DOWNCASTS))
+
+DRIVE_FILES = {
+    'article_master_web': '1rLdTRGW2iu50edIDWnGSBkZqWznnNXLK',
+    'customer_dna_master': '182gmD8nYPAuy8JO_vIqzVJy8eMKqrGvH',
+    'customer_test_validation': '1mAufyQbOrpXdjkYXE4nhYyleGBoB6nXB',
+    'visual_dna_embeddings': '1VLNeGstZhn0_TdMiV-6nosxvxyFO5a54',
+    'hm_web_images': '1z27fEDUpgXfiFzb1eUv5i5pbIA_cI7UA'
+}
+
+CSV_FILES = {
+    'article_master_web': 'article_master_web.csv',
+    'customer_dna_master': 'customer_dna_master.csv',
+    'customer_test_validation': 'customer_test_validation.csv',
+    'visual_dna_embeddings': 'visual_dna_embeddings.csv'
+}
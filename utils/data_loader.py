@@ -0,0 +1,520 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+import pyarrow.feather as feather
+import gdown
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+import os
+import io
+import shutil
+import zipfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Tuple, List, Callable
+import urllib.request
+from PIL import Image
+
+from utils.constants import (
+    IMAGES_ZIP_PATH, IMAGES_DIR, IMAGE_EXTENSION_RANK, INITIAL_IMAGE_COUNT, THUMBNAIL_SIZE,
+    THUMBNAIL_ATLAS_PATH, THUMBNAIL_ATLAS_INDEX_PATH, ATLAS_COLUMNS,
+    DOWNLOAD_CHUNK_SIZE, DOWNLOAD_RETRIES, DOWNLOAD_BACKOFF,
+    DATASET_COLUMNS, DATASET_SCHEMA, REQUIRED_COLUMNS, CACHE_FORMATS, CATEGORICAL_COLUMNS, NUMERIC_DOWNCASTS, DRIVE_FILES, CSV_FILES
+)
+
+def ensure_data_dir():
+    os.makedirs('data', exist_ok=True)
+
+def inventory_data_dir() -> Dict[str, int]:
+    """{name: size} for everything in the data folder"""
+    with os.scandir('data') as entries:
+        return {entry.name: entry.stat().st_size for entry in entries}
+
+def fetch_to_part(url: str, part_path: str, validator: Dict[str, str]) -> bool:
+    """One download attempt into `part_path`, resuming an earlier short attempt; True once complete"""
+    for attempt_url in (url, f"{url}&confirm=t"):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        # identity encoding: byte offsets and Content-Length refer to the file itself
+        headers = {'Accept-Encoding': 'identity'}
+        if offset and validator:
+            # If-Range: the server resumes only if the file is unchanged, otherwise sends it whole
+            headers['Range'] = f'bytes={offset}-'
+            headers.update(validator)
+        with requests.get(attempt_url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 416:
+                # Nothing left to serve past our offset - the part file can't be trusted, restart
+                os.remove(part_path)
+                return False
+            response.raise_for_status()
+            # Drive answers large files with an HTML "can't scan for viruses" page - retry with confirm=t
+            if response.headers.get('Content-Type', '').startswith('text/html'):
+                continue
+            if response.status_code != 206:
+                offset = 0  # Not resumed - the body is the whole file
+            file_version = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            if file_version:
+                validator['If-Range'] = file_version
+            length = response.headers.get('Content-Length')
+            expected = offset + int(length) if length is not None else None
+            with open(part_path, 'ab' if offset else 'wb', buffering=0) as f:
+                shutil.copyfileobj(response.raw, f, DOWNLOAD_CHUNK_SIZE)
+        if expected is None:
+            return True
+        size = os.path.getsize(part_path)
+        if size > expected:
+            os.remove(part_path)
+        return size == expected
+    raise ValueError(f"No file served at {url}, only an HTML page")
+
+def stream_download(url: str, file_path: str) -> bool:
+    """Stream a download to disk via a .part file, retrying dropped transfers with backoff"""
+    part_path = file_path + '.part'
+    if os.path.exists(part_path):
+        # Left by an earlier run - the remote file may have changed since, don't splice onto it
+        os.remove(part_path)
+    validator = {}
+    for attempt in range(DOWNLOAD_RETRIES):
+        if attempt:
+            time.sleep(DOWNLOAD_BACKOFF * 2 ** (attempt - 1))
+        try:
+            if fetch_to_part(url, part_path, validator):
+                os.replace(part_path, file_path)
+                return True
+        except requests.HTTPError as e:
+            # Client errors (missing file, no access) won't change on retry; timeouts/rate limits might
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and 400 <= status < 500 and status not in (408, 429):
+                return False
+        except ValueError:
+            return False
+        except (requests.RequestException, ProtocolError, ReadTimeoutError, OSError):
+            # Connection dropped or timed out - the next attempt resumes the part file
+            continue
+    return False
+
+def download_from_drive(file_id: str, file_path: str, inventory: Optional[Dict[str, int]] = None) -> bool:
+    """Download file from Google Drive with multiple fallback methods"""
+    try:
+        file_name = os.path.basename(file_path)
+        if inventory is not None:
+            if file_name in inventory:
+                return True
+        elif os.path.exists(file_path):
+            return True
+        
+        url = f"https://drive.google.com/uc?id={file_id}"
+        
+        try:
+            if not stream_download(url, file_path):
+                raise IOError(f"No file served for {file_id}")
+        except:
+            try:
+                # Downloads run concurrently on worker threads
+                gdown.download(url, file_path, quiet=True)
+            except:
+                urllib.request.urlretrieve(url, file_path)
+        
+        if not os.path.exists(file_path):
+            return False
+        if inventory is not None:
+            inventory[file_name] = os.path.getsize(file_path)
+        return True
+    except:
+        return False
+
+def load_csv_safe(file_path: str, columns: Optional[List[str]] = None,
+                  cache_format: str = 'parquet', dtypes: Optional[Dict[str, str]] = None) -> Optional[pd.DataFrame]:
+    """Load a CSV via a columnar cache (Parquet, or uncompressed Feather), reading only `columns`"""
+    cache_path = os.path.splitext(file_path)[0] + ('.feather' if cache_format == 'feather' else '.parquet')
+    try:
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            if cache_format == 'feather':
+                # Uncompressed IPC, memory-mapped
+                table = feather.read_table(cache_path, memory_map=True)
+                if columns is not None:
+                    table = table.select([col for col in columns if col in table.column_names])
+                return table.to_pandas()
+            if columns is not None:
+                available = set(pq.read_schema(cache_path).names)
+                columns = [col for col in columns if col in available]
+            # Memory-mapped read
+            return pq.read_table(cache_path, columns=columns, memory_map=True).to_pandas()
+        
+        df = pd.read_csv(file_path, engine='pyarrow', dtype=dtypes)
+        try:
+            # Cache the full file so adding a column later doesn't need a re-parse
+            if cache_format == 'feather':
+                feather.write_feather(df, cache_path, compression='uncompressed')
+            else:
+                df.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=False)
+        except:
+            pass
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df
+    except:
+        return None
+
+def extract_members(zip_path: str, members: List[zipfile.ZipInfo], images_dir: str) -> None:
+    """Extract one shard of the archive on its own handle (ZipFile handles aren't thread-safe)"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info in members:
+            # Stored top-level files are copied directly, skipping extract()'s path handling
+            if info.compress_type == zipfile.ZIP_STORED and not info.is_dir() \
+                    and os.path.basename(info.filename) == info.filename and info.filename not in ('.', '..'):
+                with zip_ref.open(info) as source, open(os.path.join(images_dir, info.filename), 'wb') as target:
+                    shutil.copyfileobj(source, target, min(max(info.file_size, 1), DOWNLOAD_CHUNK_SIZE))
+            else:
+                zip_ref.extract(info, images_dir)
+
+def extract_images(zip_path: str, images_dir: str, article_ids: Optional[List[str]] = None,
+                   n_workers: Optional[int] = None) -> None:
+    """Extract the image archive (or only `article_ids`' images) in parallel shards"""
+    if n_workers is None:
+        n_workers = min(8, os.cpu_count() or 1)
+    
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = zip_ref.infolist()
+    
+    if article_ids is not None:
+        wanted = set(article_ids)
+        members = [info for info in members if os.path.splitext(os.path.basename(info.filename))[0] in wanted]
+    
+    # Create folders up front so workers never race on makedirs
+    os.makedirs(images_dir, exist_ok=True)
+    for folder in {os.path.dirname(info.filename) for info in members}:
+        os.makedirs(os.path.join(images_dir, folder), exist_ok=True)
+    
+    shards = [members[i::n_workers] for i in range(n_workers)]
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        list(executor.map(lambda shard: extract_members(zip_path, shard, images_dir), shards))
+
+@st.cache_resource(show_spinner=False)
+def open_image_archive(zip_path: str) -> Optional[Tuple[zipfile.ZipFile, Dict[str, str], threading.Lock]]:
+    """Shared archive handle, lock and {article_id: member} index for lazy extraction"""
+    if not os.path.exists(zip_path):
+        return None
+    zip_ref = zipfile.ZipFile(zip_path, 'r')
+    index = {
+        os.path.splitext(os.path.basename(member))[0]: member
+        for member in zip_ref.namelist() if not member.endswith('/')
+    }
+    return zip_ref, index, threading.Lock()
+
+def extract_image_on_demand(article_id_str: str, images_dir: str) -> Optional[str]:
+    """Extract a single article's image from the archive the first time it's requested"""
+    archive = open_image_archive(IMAGES_ZIP_PATH)
+    if archive is None:
+        return None
+    zip_ref, index, lock = archive
+    member = index.get(article_id_str)
+    if member is None:
+        return None
+    with lock:
+        return zip_ref.extract(member, images_dir)
+
+def prepare_environment(on_progress: Optional[Callable[[int, int], None]] = None,
+                        inventory: Optional[Dict[str, int]] = None) -> Dict[str, str]:
+    """Download the missing CSVs concurrently and return {dataset key: path} for those available"""
+    if inventory is None:
+        inventory = inventory_data_dir()
+    missing = [key for key, filename in CSV_FILES.items() if filename not in inventory]
+    failed = set()
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            downloads = {
+                executor.submit(download_from_drive, DRIVE_FILES[key], f'data/{CSV_FILES[key]}', inventory): key
+                for key in missing
+            }
+            for done, job in enumerate(as_completed(downloads), start=1):
+                if not job.result():
+                    failed.add(downloads[job])
+                if on_progress is not None:
+                    on_progress(done, len(missing))
+    
+    return {key: f'data/{filename}' for key, filename in CSV_FILES.items() if key not in failed}
+
+@st.cache_data(show_spinner=False)
+def load_dataset(key: str, file_path: str, mtime: float) -> pd.DataFrame:
+    """Parse and narrow one dataset, cached per file and mtime (raises if unreadable)"""
+    # Float downcasts happen in the parser; integers go through to_numeric below
+    float_dtypes = {col: 'float32' for col, downcast in NUMERIC_DOWNCASTS.get(key, {}).items() if downcast == 'float'}
+    df = load_csv_safe(file_path, DATASET_COLUMNS.get(key), CACHE_FORMATS.get(key, 'parquet'), float_dtypes)
+    if df is None:
+        raise ValueError(f"Could not read {file_path}")
+    
+    for col in CATEGORICAL_COLUMNS.get(key, []):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col, downcast in NUMERIC_DOWNCASTS.get(key, {}).items():
+        if col in df.columns:
+            # Integer columns with gaps can't hold NaN - narrow them as floats instead
+            if downcast == 'integer' and df[col].isna().any():
+                downcast = 'float'
+            df[col] = pd.to_numeric(df[col], downcast=downcast)
+    
+    if key == 'article_master_web':
+        # Zero-padded article IDs, as Arrow-backed strings
+        df['article_id'] = df['article_id'].astype('string[pyarrow]').str.zfill(10)
+        
+        # Revenue potential, shared by several pages
+        df['revenue_potential'] = (df['price'] * df['hotness_score']).astype('float32')
+    
+    return df
+
+@st.cache_data(show_spinner=False, persist="disk")
+def build_lookups(_data: Dict, data_version: Tuple[str, Tuple[Tuple[str, str, float], ...]]) -> Dict:
+    """Lookup structures the pages share, derived from the loaded frames and keyed on `data_version`"""
+    lookups = {}
+    df_articles = _data.get('article_master_web')
+    if df_articles is not None:
+        # Catalogue-wide emotion distribution, mode first
+        lookups['mood_counts'] = df_articles['mood'].value_counts()
+        
+        # Page 5 price slider bounds
+        lookups['price_bounds'] = (float(df_articles['price'].min()), float(df_articles['price'].max()))
+        
+        # Page 5 product picker lookups (reversed so the first row wins for duplicate names)
+        lookups['article_positions'] = dict(zip(df_articles['article_id'], range(len(df_articles))))
+        lookups['product_positions'] = dict(zip(df_articles['prod_name'][::-1], range(len(df_articles) - 1, -1, -1)))
+    
+    # Customer rows per purchased emotion, and each customer's most purchased emotion
+    df_transactions = _data.get('customer_test_validation')
+    if df_transactions is not None:
+        df_customers = _data.get('customer_dna_master')
+        if df_customers is not None:
+            customer_index = pd.Index(df_customers['customer_id'])
+            lookups['customer_positions_by_mood'] = {}
+            for mood, customer_ids in df_transactions.groupby('actual_purchased_mood', observed=True)['customer_id'].unique().items():
+                positions = customer_index.get_indexer_for(customer_ids)
+                lookups['customer_positions_by_mood'][str(mood)] = np.unique(positions[positions >= 0])
+        
+        # Customer x emotion counts; argmax breaks ties alphabetically (first category)
+        mood_matrix = df_transactions.groupby(['customer_id', 'actual_purchased_mood'], observed=True).size().unstack(fill_value=0)
+        lookups['customer_moods'] = dict(zip(mood_matrix.index, mood_matrix.columns.astype(str)[mood_matrix.to_numpy().argmax(axis=1)]))
+    
+    return lookups
+
+def load_datasets(csv_files: Tuple[Tuple[str, str, float], ...]) -> Dict:
+    """Load every dataset and build the shared lookups"""
+    data = {}
+    
+    for key, file_path, mtime in csv_files:
+        try:
+            data[key] = load_dataset(key, file_path, mtime)
+        except ValueError:
+            continue
+    
+    # Schema signature + (key, path, mtime) of each loaded file
+    data['version'] = (DATASET_SCHEMA, tuple(entry for entry in csv_files if entry[0] in data))
+    data.update(build_lookups(data, data['version']))
+    
+    return data
+
+def validate_data(data: Dict) -> bool:
+    """Check every required dataset loaded non-empty, with its required columns present and populated"""
+    for key, columns in REQUIRED_COLUMNS.items():
+        df = data.get(key)
+        if df is None or df.shape[0] == 0:
+            return False
+        if not set(columns).issubset(df.columns) or not df[columns].notna().any().all():
+            return False
+    return True
+
+@st.cache_resource
+def load_data_from_drive() -> Dict:
+    ensure_data_dir()
+    inventory = inventory_data_dir()
+    st.info("🔄 Loading data from Google Drive...")
+    progress_bar = st.progress(0)
+    
+    # Images download in the background while the CSVs load
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        images_job = None
+        if os.path.basename(IMAGES_DIR) not in inventory:
+            if os.path.basename(IMAGES_ZIP_PATH) not in inventory:
+                st.info("📥 Downloading images in the background (this may take a few minutes)...")
+            images_job = executor.submit(download_from_drive, DRIVE_FILES['hm_web_images'], IMAGES_ZIP_PATH, inventory)
+        
+        csv_paths = prepare_environment(lambda done, total: progress_bar.progress(0.3 * done / total), inventory)
+        progress_bar.progress(0.3)
+        
+        data = load_datasets(tuple((key, path, os.path.getmtime(path)) for key, path in csv_paths.items()))
+        data['valid'] = validate_data(data)
+        progress_bar.progress(0.8)
+        
+        images_downloaded = images_job is not None and images_job.result()
+    
+    df_articles = data.get('article_master_web')
+    initial_ids = None
+    if df_articles is not None:
+        initial_ids = df_articles['article_id'].iloc[
+            top_k_positions(df_articles['hotness_score'].to_numpy(), INITIAL_IMAGE_COUNT)
+        ].tolist()
+    
+    if images_downloaded:
+        # Only the initial images; get_image_path extracts the rest on demand
+        try:
+            st.info("📦 Extracting images...")
+            extract_images(IMAGES_ZIP_PATH, IMAGES_DIR, initial_ids)
+            st.success("✅ Images extracted!")
+        except Exception as e:
+            st.warning(f"⚠️ Image extraction issue: {str(e)}")
+        if os.path.isdir(IMAGES_DIR):
+            inventory[os.path.basename(IMAGES_DIR)] = 0
+    
+    data['images_dir'] = IMAGES_DIR if os.path.basename(IMAGES_DIR) in inventory else None
+    
+    if data['images_dir'] is not None and initial_ids and os.path.basename(THUMBNAIL_ATLAS_PATH) not in inventory:
+        try:
+            build_thumbnail_atlas(initial_ids, data['images_dir'])
+        except:
+            pass
+    
+    st.success("✅ Data loaded successfully!")
+    progress_bar.progress(1.0)
+    
+    return data
+
+@st.cache_resource(show_spinner=False)
+def get_available_images(images_dir: str) -> Dict[str, str]:
+    """{article_id: image path} for the folder"""
+    if not os.path.isdir(images_dir):
+        return {}
+    best = {}
+    with os.scandir(images_dir) as entries:
+        for entry in entries:
+            article_id, ext = os.path.splitext(entry.name)
+            rank = IMAGE_EXTENSION_RANK.get(ext)
+            if rank is None or not entry.is_file():
+                continue
+            if article_id not in best or rank < best[article_id][0]:
+                best[article_id] = (rank, entry.path)
+    return {article_id: path for article_id, (rank, path) in best.items()}
+
+@st.cache_resource(show_spinner=False)
+def get_missing_images(images_dir: str) -> set:
+    """Article IDs known to have no image in the folder or the archive"""
+    return set()
+
+def get_image_path(article_id: str, images_dir: Optional[str]) -> Optional[str]:
+    """Get image path - images stored directly in folder as 10-digit ID + .jpg"""
+    if images_dir is None:
+        return None
+    try:
+        article_id_str = str(article_id)
+        missing = get_missing_images(images_dir)
+        if article_id_str in missing:
+            return None
+        available = get_available_images(images_dir)
+        image_path = available.get(article_id_str)
+        if image_path is not None:
+            return image_path
+        
+        # Not extracted yet - pull it out of the archive now
+        image_path = extract_image_on_demand(article_id_str, images_dir)
+        if image_path is not None:
+            available[article_id_str] = image_path
+        elif os.path.exists(IMAGES_ZIP_PATH):
+            # Only a definite miss once the archive is on disk (it may still be downloading)
+            missing.add(article_id_str)
+        return image_path
+    except:
+        return None
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def get_thumbnail(image_path: str) -> Optional[bytes]:
+    """Downscaled JPEG bytes for grid tiles"""
+    try:
+        with Image.open(image_path) as img:
+            img.thumbnail(THUMBNAIL_SIZE)
+            buffer = io.BytesIO()
+            img.convert('RGB').save(buffer, 'JPEG', quality=80, optimize=True)
+        return buffer.getvalue()
+    except:
+        return None
+
+def build_thumbnail_atlas(article_ids: List[str], images_dir: str) -> None:
+    """Pack the given articles' thumbnails into one sprite sheet + {article_id: box} index"""
+    tile_w, tile_h = THUMBNAIL_SIZE
+    boxes = []
+    for article_id in article_ids:
+        image_path = get_image_path(article_id, images_dir)
+        if image_path is None:
+            continue
+        try:
+            with Image.open(image_path) as img:
+                img.thumbnail(THUMBNAIL_SIZE)
+                boxes.append((article_id, img.convert('RGB')))
+        except:
+            continue
+    if not boxes:
+        return
+    
+    rows = -(-len(boxes) // ATLAS_COLUMNS)
+    atlas = Image.new('RGB', (tile_w * min(len(boxes), ATLAS_COLUMNS), tile_h * rows), 'white')
+    index = []
+    for i, (article_id, thumb) in enumerate(boxes):
+        x, y = (i % ATLAS_COLUMNS) * tile_w, (i // ATLAS_COLUMNS) * tile_h
+        atlas.paste(thumb, (x, y))
+        index.append((article_id, x, y, thumb.width, thumb.height))
+    
+    # Index first, atlas last: the atlas file's existence marks a complete build
+    pd.DataFrame(index, columns=['article_id', 'x', 'y', 'w', 'h']).to_parquet(THUMBNAIL_ATLAS_INDEX_PATH, index=False)
+    atlas.save(THUMBNAIL_ATLAS_PATH, 'PNG')
+
+@st.cache_resource(show_spinner=False)
+def open_thumbnail_atlas() -> Optional[Tuple[Image.Image, Dict[str, Tuple[int, int, int, int]]]]:
+    """The decoded sprite sheet and its tile boxes"""
+    if not (os.path.exists(THUMBNAIL_ATLAS_PATH) and os.path.exists(THUMBNAIL_ATLAS_INDEX_PATH)):
+        return None
+    try:
+        atlas = Image.open(THUMBNAIL_ATLAS_PATH)
+        atlas.load()
+        index = pd.read_parquet(THUMBNAIL_ATLAS_INDEX_PATH)
+        boxes = {
+            article_id: (x, y, x + w, y + h)
+            for article_id, x, y, w, h in index.itertuples(index=False, name=None)
+        }
+        return atlas, boxes
+    except:
+        return None
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def get_article_thumbnail(article_id: str, images_dir: Optional[str]) -> Optional[bytes]:
+    """Grid tile bytes, cropped from the sprite sheet or thumbnailed from the image file"""
+    atlas = open_thumbnail_atlas()
+    if atlas is not None and article_id in atlas[1]:
+        buffer = io.BytesIO()
+        atlas[0].crop(atlas[1][article_id]).save(buffer, 'JPEG', quality=80, optimize=True)
+        return buffer.getvalue()
+    image_path = get_image_path(article_id, images_dir)
+    return get_thumbnail(image_path) if image_path else None
+
+def top_k_positions(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k largest values, highest first, in nlargest order"""
+    missing = np.isnan(values)
+    if missing.any():
+        # Rank only the present values and map back; like nlargest, NaN rows just fill any
+        # remaining slots, in row order
+        present = np.flatnonzero(~missing)
+        ranked = present[top_k_positions(values[present], k)]
+        return np.concatenate([ranked, np.flatnonzero(missing)[:k - len(ranked)]])
+    if len(values) > k:
+        kth_value = -np.partition(-values, k - 1)[k - 1]
+        above = np.flatnonzero(values > kth_value)
+        ties = np.flatnonzero(values == kth_value)[:k - len(above)]
+        positions = np.sort(np.concatenate([above, ties]))
+    else:
+        positions = np.arange(len(values))
+    return positions[np.argsort(-values[positions], kind='stable')]
+
+def performance_tiers(hotness: pd.Series) -> pd.Series:
+    """Low / Medium / High / Very High hotness tiers, with bin edges in the column's own dtype"""
+    return pd.cut(
+        hotness,
+        bins=np.array([0, 0.3, 0.5, 0.7, 1.0], dtype=hotness.dtype),
+        labels=['Low', 'Medium', 'High', 'Very High']
+    ).rename('performance_tier')
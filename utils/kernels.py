@@ -0,0 +1,44 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Serial kernels: sessions run on several threads, which numba's workqueue layer can't share
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def match_score_kernel(prices, hotness, same_section, sp_price, sp_hotness, price_scale):
+        """Smart Match score fused into one pass: mood (0.4) + section, price, hotness (0.2 each)"""
+        scores = np.empty(prices.size)
+        for i in range(prices.size):
+            score = 0.4
+            if same_section[i]:
+                score += 0.2
+            if price_scale > 0:
+                score += (1.0 - min(abs(prices[i] - sp_price) / price_scale, 1.0)) * 0.2
+            score += (1.0 - min(abs(hotness[i] - sp_hotness), 1.0)) * 0.2
+            scores[i] = score
+        return scores
+
+    # Warm the JIT at import, with the loader's float32 price/hotness
+    match_score_kernel(np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.float32), np.zeros(1, dtype=np.bool_), 0.0, 0.0, 1.0)
+
+    @njit(cache=True)
+    def group_threshold_counts(codes, scores, n_groups, low, high):
+        """Per-group counts of scores above `high` and below `low` in one pass over category codes"""
+        above = np.zeros(n_groups, dtype=np.int64)
+        below = np.zeros(n_groups, dtype=np.int64)
+        for i in range(codes.size):
+            group = codes[i]
+            if group < 0:
+                continue
+            if scores[i] > high:
+                above[group] += 1
+            elif scores[i] < low:
+                below[group] += 1
+        return above, below
+
+    group_threshold_counts(np.zeros(1, dtype=np.int8), np.zeros(1, dtype=np.float32), 1, np.float32(0.3), np.float32(0.7))